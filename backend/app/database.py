@@ -9,12 +9,22 @@ logger = logging.getLogger(__name__)
 # Import settings after logger to avoid circular imports
 from .config import settings
 
+# Pool sizing only applies to server databases; SQLite picks its own pool class
+pool_options = {}
+if not settings.database_url.startswith("sqlite"):
+    pool_options = {
+        "pool_size": settings.db_pool_size,          # Room for concurrent scan tasks alongside API requests
+        "max_overflow": settings.db_max_overflow,
+        "pool_timeout": settings.db_pool_timeout
+    }
+
 # Engine configuration with connection pooling and error handling
 engine = create_engine(
     settings.database_url,
     pool_pre_ping=True,  # Verify connections before use
     pool_recycle=300,    # Recycle connections every 5 minutes
-    echo=settings.sql_debug
+    echo=settings.sql_debug,
+    **pool_options
 )
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
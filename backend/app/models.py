@@ -3,7 +3,7 @@ Database models for DiscoverIT application.
 """
 from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, ForeignKey, JSON, Index, Float, Enum
 from sqlalchemy.orm import relationship
-from sqlalchemy.sql import func
+from sqlalchemy.sql import func, text
 from datetime import datetime, timezone
 import enum
 from .database import Base
@@ -195,6 +195,17 @@ class ScanTask(Base):
     scans = relationship("Scan", back_populates="scan_task", cascade="all, delete-orphan")
     scan_template = relationship("ScanTemplate")
     subnet = relationship("Subnet", back_populates="scan_tasks")
+    
+    __table_args__ = (
+        # Task list is always ordered by start_time
+        Index('ix_scan_tasks_start_time', 'start_time'),
+        # Partial index: only the handful of running tasks are indexed
+        Index(
+            'ix_scan_tasks_running_start_time', 'start_time',
+            postgresql_where=text("status = 'running'"),
+            sqlite_where=text("status = 'running'")
+        ),
+    )
 
 
 class Scan(Base):
@@ -212,6 +223,12 @@ class Scan(Base):
     # Relationships
     asset = relationship("Asset", back_populates="scans")
     scan_task = relationship("ScanTask", back_populates="scans")
+    
+    __table_args__ = (
+        Index('ix_scans_task_status', 'scan_task_id', 'status'),
+        # Scan history per asset, newest first; also serves the asset delete cascade
+        Index('ix_scans_asset_timestamp', 'asset_id', 'timestamp'),
+    )
 
 
 class Credential(Base):
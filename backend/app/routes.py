@@ -2,6 +2,7 @@
 Improved API routes with enhanced error handling and service factory pattern.
 """
 from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks, Query, Request, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from typing import List, Optional
 import logging
@@ -466,7 +467,11 @@ async def download_scan_results(
 ):
     """Download scan results for a specific task."""
     scan_service = services.get_scan_service()
-    return scan_service.download_scan_results(task_id)
+    return StreamingResponse(
+        scan_service.download_scan_results(task_id),
+        media_type="application/json",
+        headers={"Content-Disposition": f'attachment; filename="scan-results-{task_id}.json"'}
+    )
 
 
 # Asset routes with improved error handling
@@ -15,6 +15,13 @@ from ..models import Asset, ScanTask
 from ..schemas import AssetCreate
 from .base_service import BaseService
 
+# Service and port signatures used to classify discovered devices
+_SHELL_SERVICES = frozenset({"ssh", "telnet"})
+_SHELL_PORTS = frozenset({22, 23})
+_WEB_SERVICES = frozenset({"http", "https"})
+_DESKTOP_SERVICES = frozenset({"rdp", "smb"})
+_PRINTER_SERVICES = frozenset({"printer", "ipp"})
+
 
 class EnhancedDiscoveryService:
     def __init__(self, db: Session):
@@ -383,26 +390,35 @@ class EnhancedDiscoveryService:
         os_info = device.get("os_info", {})
         vendor = device.get("vendor", "").lower()
         
+        # Collect services in a single pass over the ports
+        services = set()
+        has_shell = False
+        for port in ports:
+            service = port["service"]
+            services.add(service)
+            if service in _SHELL_SERVICES and port["port"] in _SHELL_PORTS:
+                has_shell = True
+        
         # Check for specific device types based on ports and services
-        if any(port["service"] in ["ssh", "telnet"] and port["port"] in [22, 23] for port in ports):
-            if any(port["service"] in ["http", "https"] for port in ports):
+        if has_shell:
+            if services & _WEB_SERVICES:
                 return "server"
             else:
                 return "network_device"
         
-        if any(port["service"] in ["snmp"] for port in ports):
+        if "snmp" in services:
             if "cisco" in vendor or "juniper" in vendor:
                 return "router"
             elif "hp" in vendor or "dell" in vendor:
                 return "switch"
         
-        if any(port["service"] in ["http", "https"] for port in ports):
-            if any(port["service"] in ["rdp", "smb"] for port in ports):
+        if services & _WEB_SERVICES:
+            if services & _DESKTOP_SERVICES:
                 return "workstation"
             else:
                 return "server"
         
-        if any(port["service"] in ["printer", "ipp"] for port in ports):
+        if services & _PRINTER_SERVICES:
             return "printer"
         
         # Fallback to OS-based detection
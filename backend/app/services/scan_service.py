@@ -1,29 +1,82 @@
 """
 Enhanced Scan service for managing network scans and scan tasks.
 """
-from typing import List, Optional, Dict, Any
-from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import and_, desc
-from ..models import ScanTask, Scan, Asset
+from typing import List, NamedTuple, Optional, Dict, Any, AsyncIterator, Iterator, Tuple
+from sqlalchemy.orm import Session
+from sqlalchemy import and_, desc, func, update
+from ..config import settings
+from ..models import ScanTask, Scan, Asset, ScannerConfig
 from ..schemas import ScanTaskCreate, ScanTaskUpdate
 from .asset_service import AssetService
+from .scanner_service_enhanced import ScannerServiceV2
+from .template_service import TemplateService
+import aiohttp
 import ipaddress
-import requests
 import json
 from datetime import datetime
 import asyncio
-import concurrent.futures
+from collections import Counter
+import itertools
 import logging
+import math
+import random
+import socket
+import struct
+import threading
 import time
-import subprocess
+import xml.etree.ElementTree as ET
 
 logger = logging.getLogger(__name__)
 
+# Upper bound on scan results written together in one transaction
+SCAN_BATCH_SIZE = 100
+
+# Most hosts handed to a single local nmap process
+LOCAL_SCAN_CHUNK_SIZE = 256
+
+# Bytes read from local nmap stdout per parser feed
+NMAP_READ_SIZE = 64 * 1024
+
+# Seconds to let nmap exit on its own after a failed read before killing it
+NMAP_EXIT_GRACE_SECONDS = 1.0
+
+# Minimum seconds between progress writes for partially filled batches
+PROGRESS_HEARTBEAT_SECONDS = 1.0
+
+# Retries for transient scanner service failures before falling back to local nmap
+SCANNER_MAX_RETRIES = 2
+SCANNER_RETRY_BACKOFF = 0.2
+_RETRY_STATUSES = frozenset({502, 503, 504})
+
+_pack_ipv4 = struct.Struct('!I').pack
+
+# Service, port and vendor signatures used to classify scanned devices
+_NETWORK_SERVICES = frozenset({"ssh", "telnet", "snmp"})
+_WEB_SERVICES = frozenset({"http", "https", "apache", "nginx"})
+_DATABASE_SERVICES = frozenset({"mysql", "postgresql", "mssql", "oracle"})
+_PRINTER_SERVICES = frozenset({"ipp", "lpd", "printer"})
+_SNMP_PORTS = frozenset({161, 162})
+_NETWORK_VENDORS = ("cisco", "netgear", "linksys", "tp-link")
+
+# Cancellation flags for scan tasks running in this process, keyed by task ID
+_cancel_events: Dict[int, threading.Event] = {}
+
+
+class _ScanFlags(NamedTuple):
+    """Discovery indicators shared by result categorization and device detection."""
+    port_count: int
+    has_mac: bool
+    has_hostname: bool
+    has_os: bool
+    has_vendor: bool
+    has_response_time: bool
+    has_ttl: bool
+    service_count: int
+
 
 class ScanServiceV2:
     def __init__(self, db: Session):
         self.db = db
-        from .scanner_service_enhanced import ScannerServiceV2
         self.scanner_service = ScannerServiceV2(db)
         self.asset_service = AssetService(db)
 
@@ -54,10 +107,8 @@ class ScanServiceV2:
         return task
 
     def get_scan_task(self, task_id: int) -> Optional[ScanTask]:
-        """Get a scan task by ID with all related data."""
-        return self.db.query(ScanTask).options(
-            joinedload(ScanTask.scans)
-        ).filter(ScanTask.id == task_id).first()
+        """Get a scan task by ID without loading its scans."""
+        return self.db.query(ScanTask).filter(ScanTask.id == task_id).first()
 
     def get_scan_tasks(
         self, 
@@ -66,9 +117,8 @@ class ScanServiceV2:
         status: Optional[str] = None
     ) -> List[ScanTask]:
         """Get scan tasks with optional filtering."""
-        query = self.db.query(ScanTask).options(
-            joinedload(ScanTask.scans)
-        )
+        # The list response does not include scans, so they are not loaded here
+        query = self.db.query(ScanTask)
         
         if status:
             query = query.filter(ScanTask.status == status)
@@ -76,10 +126,10 @@ class ScanServiceV2:
         return query.order_by(desc(ScanTask.start_time)).offset(skip).limit(limit).all()
 
     def get_active_scan_task(self) -> Optional[ScanTask]:
-        """Get the currently active scan task."""
+        """Get the most recently started active scan task."""
         return self.db.query(ScanTask).filter(
             ScanTask.status == "running"
-        ).first()
+        ).order_by(desc(ScanTask.start_time)).first()
 
     def cancel_scan_task(self, task_id: int) -> bool:
         """Cancel a running scan task."""
@@ -91,13 +141,21 @@ class ScanServiceV2:
         task.end_time = datetime.utcnow()
         self.db.commit()
         
+        # Signal the scan loop if it is running in this process
+        cancel_event = _cancel_events.get(task_id)
+        if cancel_event:
+            cancel_event.set()
+        
         logger.info(f"Cancelled scan task {task_id}")
         return True
 
     def get_ips_from_target(self, target: str) -> List[str]:
         """Get list of IPs to scan from target specification."""
-        ips = []
-        
+        _, ips = self.iter_ips_from_target(target)
+        return list(ips)
+
+    def iter_ips_from_target(self, target: str) -> Tuple[int, Iterator[str]]:
+        """Validate a target and return its IP count with a lazy iterator over the IPs."""
         try:
             if '/' in target:
                 # CIDR notation
@@ -106,18 +164,23 @@ class ScanServiceV2:
                 if network.num_addresses > 1024:
                     raise ValueError(f"Target network too large: {network.num_addresses} addresses (max 1024)")
                 
-                for ip in network.hosts():
-                    ips.append(str(ip))
-            else:
-                # Single IP
-                ipaddress.ip_address(target)  # Validate
-                ips.append(target)
+                if network.version == 4 and network.num_addresses > 2:
+                    # Format host addresses straight from their integer values,
+                    # skipping the network and broadcast addresses
+                    first = int(network.network_address) + 1
+                    last = int(network.broadcast_address)
+                    return last - first, (socket.inet_ntoa(_pack_ipv4(ip)) for ip in range(first, last))
+                
+                hosts = list(network.hosts())
+                return len(hosts), (str(ip) for ip in hosts)
+            
+            # Single IP
+            ipaddress.ip_address(target)  # Validate
+            return 1, iter((target,))
                 
         except ValueError as e:
             logger.error(f"Invalid target format: {target} - {e}")
             raise ValueError(f"Invalid target format: {e}")
-        
-        return ips
 
     def get_scanner_recommendation(self, target: str, current_user=None) -> Dict[str, Any]:
         """Get scanner recommendation for a target network."""
@@ -193,90 +256,29 @@ class ScanServiceV2:
             self.db.commit()
             
             # Get IPs to scan
-            ips_to_scan = self.get_ips_from_target(task.target)
-            total_ips = len(ips_to_scan)
+            total_ips, ips_to_scan = self.iter_ips_from_target(task.target)
             task.total_ips = total_ips
             self.db.commit()
             
             logger.info(f"Scanning {total_ips} IPs for task {task_id}")
             
-            # Update progress as we scan
-            for i, ip in enumerate(ips_to_scan):
-                # Check for cancellation
-                self.db.refresh(task)
-                if task.status == "cancelled":
-                    logger.info(f"Scan task {task_id} cancelled")
-                    break
-                
-                # Update current IP and progress
-                task.current_ip = ip
-                task.completed_ips = i
-                # Ensure progress never exceeds 100%
-                progress = int((i / total_ips) * 100) if total_ips > 0 else 0
-                task.progress = min(progress, 100)
-                self.db.commit()
-                
-                try:
-                    # Get scan configuration from template
-                    scan_config = self._get_scan_config_from_template(task)
-                    
-                    # Perform the scan
-                    scan_result = self._perform_scan(ip, scan_config)
-                    
-                    # Categorize the scan result
-                    categorization = self._categorize_scan_result(scan_result)
-                    scan_result["categorization"] = categorization
-                    
-                    # Add task metadata
-                    scan_result["task_metadata"] = {
-                        "task_id": task.id,
-                        "task_name": task.name,
-                        "scan_timestamp": datetime.utcnow().isoformat()
-                    }
-                    
-                    # Create scan record
-                    scan = Scan(
-                        asset_id=None,  # No asset created automatically
-                        scan_task_id=task.id,
-                        scan_data=scan_result,
-                        scan_type=scan_config["scan_type"],
-                        status="completed" if categorization["is_device"] else "no_device"
-                    )
-                    self.db.add(scan)
-                    self.db.commit()
-                    
-                    logger.debug(f"Scanned {ip}: {categorization['result_type']}")
-                    
-                except Exception as e:
-                    logger.error(f"Failed to scan {ip}: {e}")
-                    # Create failed scan record
-                    failed_scan = Scan(
-                        asset_id=None,
-                        scan_task_id=task.id,
-                        scan_data={
-                            "ip": ip,
-                            "status": "failed",
-                            "error": str(e),
-                            "timestamp": datetime.utcnow().isoformat()
-                        },
-                        scan_type=scan_config["scan_type"],
-                        status="failed"
-                    )
-                    self.db.add(failed_scan)
-                    self.db.commit()
+            # Get scan configuration from template once for the whole task
+            scan_config = self._get_scan_config_from_template(task)
+            
+            # Route IPs to scanners once for the whole target rather than per IP
+            scanner_groups = self._group_ips_by_scanner(task.target, total_ips, ips_to_scan)
+            
+            # Scan IPs concurrently; results are persisted as they complete
+            cancel_event = _cancel_events.setdefault(task_id, threading.Event())
+            discovered_count = asyncio.run(
+                self._scan_ips(task, total_ips, scanner_groups, scan_config, cancel_event)
+            )
             
             # Mark task as completed
             if task.status != "cancelled":
                 task.status = "completed"
                 task.progress = 100
                 task.completed_ips = total_ips
-                
-                # Count actual discovered devices
-                discovered_count = self.db.query(Scan).filter(
-                    Scan.scan_task_id == task.id,
-                    Scan.status == "completed"
-                ).count()
-                
                 task.discovered_devices = discovered_count
                 logger.info(f"Scan task {task_id} completed: {discovered_count} devices found")
             
@@ -290,6 +292,224 @@ class ScanServiceV2:
             task.error_message = str(e)
             task.end_time = datetime.utcnow()
             self.db.commit()
+        finally:
+            _cancel_events.pop(task_id, None)
+
+    async def _scan_ips(
+        self,
+        task: ScanTask,
+        total_ips: int,
+        scanner_groups: List[Tuple[Optional[Dict[str, Any]], int, Iterator[str]]],
+        scan_config: Dict[str, Any],
+        cancel_event: threading.Event
+    ) -> int:
+        """Scan target IPs concurrently while a single writer persists the results; return the devices found."""
+        max_concurrent = max(1, settings.max_concurrent_scans)
+        # Workers bound the requests in flight; keep each scanner within the global limit
+        connector = aiohttp.TCPConnector(limit_per_host=max_concurrent)
+        results_q: asyncio.Queue = asyncio.Queue(maxsize=256)
+        
+        # Scan workers only see plain values; the session belongs to the writer
+        task_id, task_name, target = task.id, task.name, task.target
+        
+        async with aiohttp.ClientSession(connector=connector) as session:
+            # A fixed set of workers per scanner pulls IPs from that scanner's iterator as they go
+            async def scan_worker(ips: Iterator[str], scanner: Dict[str, Any]):
+                for ip in ips:
+                    result = await self._scan_ip(session, task_id, task_name, ip, scan_config, scanner)
+                    await results_q.put(result)
+            
+            async def local_scan_worker(ips: Iterator[str], chunk_size: int):
+                while chunk := list(itertools.islice(ips, chunk_size)):
+                    async for ip, scan_result in self._iter_local_scan(chunk, scan_config):
+                        await results_q.put((ip, self._build_scan_row(task_id, task_name, ip, scan_result, scan_config)))
+            
+            async def close_queue() -> Optional[Exception]:
+                results = await asyncio.gather(*workers, return_exceptions=True)
+                errors = [result for result in results if isinstance(result, Exception)]
+                for error in errors:
+                    logger.error(f"Scan worker for task {task_id} failed: {error}")
+                await results_q.put(None)
+                return errors[0] if errors else None
+            
+            workers = []
+            for scanner, group_size, ips in scanner_groups:
+                if scanner:
+                    logger.info(f"Using scanner '{scanner['name']}' ({scanner['url']}) for {group_size} IPs of {target}")
+                    # Scanners do not enforce their registered limit themselves
+                    concurrency = max(1, min(max_concurrent, scanner["max_concurrent_scans"] or max_concurrent))
+                    workers += [asyncio.ensure_future(scan_worker(ips, scanner)) for _ in range(concurrency)]
+                else:
+                    # Without a scanner service, let each nmap process scan a chunk of hosts
+                    logger.warning(f"No scanner available for {group_size} IPs of {target}, using local nmap")
+                    chunk_size = max(1, min(LOCAL_SCAN_CHUNK_SIZE, math.ceil(group_size / max_concurrent)))
+                    workers += [asyncio.ensure_future(local_scan_worker(ips, chunk_size)) for _ in range(max_concurrent)]
+            closer = asyncio.ensure_future(close_queue())
+            try:
+                discovered_count = await self._write_scan_results(task_id, results_q, total_ips, cancel_event)
+                # A worker that died dropped the rest of its IPs, so the task must not complete
+                if closer.done() and closer.result():
+                    raise closer.result()
+                return discovered_count
+            finally:
+                closer.cancel()
+                for worker in workers:
+                    worker.cancel()
+                await asyncio.gather(closer, *workers, return_exceptions=True)
+
+    async def _write_scan_results(
+        self,
+        task_id: int,
+        results_q: asyncio.Queue,
+        total_ips: int,
+        cancel_event: threading.Event
+    ) -> int:
+        """Drain scan results into batched writes off the event loop; return the devices written."""
+        loop = asyncio.get_running_loop()
+        completed_ips = 0
+        discovered_count = 0
+        batch: List[Tuple[str, Dict[str, Any]]] = []
+        last_write = time.monotonic()
+        done = False
+        
+        while not done:
+            # Wait for the next result, but no longer than until the progress heartbeat is due
+            heartbeat_in = last_write + PROGRESS_HEARTBEAT_SECONDS - time.monotonic()
+            try:
+                batch.append(await asyncio.wait_for(results_q.get(), max(0.0, heartbeat_in)))
+            except asyncio.TimeoutError:
+                pass
+            else:
+                # Take whatever has queued up while the previous batch was being written
+                while len(batch) < SCAN_BATCH_SIZE and not results_q.empty():
+                    batch.append(results_q.get_nowait())
+                if batch[-1] is None:
+                    batch.pop()
+                    done = True
+            
+            # Hold partial batches until the progress heartbeat is due
+            cancel_requested = cancel_event.is_set()
+            if (
+                not (done or cancel_requested)
+                and len(batch) < SCAN_BATCH_SIZE
+                and time.monotonic() - last_write < PROGRESS_HEARTBEAT_SECONDS
+            ):
+                continue
+            if not batch:
+                if cancel_requested:
+                    logger.info(f"Scan task {task_id} cancelled")
+                    break
+                # Nothing to report this heartbeat; wait for the next one
+                last_write = time.monotonic()
+                continue
+            
+            completed_ips += len(batch)
+            discovered_count += sum(1 for _, scan_row in batch if scan_row["status"] == "completed")
+            cancelled = await loop.run_in_executor(
+                None, self._write_scan_batch, task_id, batch, completed_ips, total_ips
+            )
+            batch = []
+            last_write = time.monotonic()
+            
+            # Cancellation from this process or from another worker process
+            if cancel_requested or cancelled:
+                logger.info(f"Scan task {task_id} cancelled")
+                break
+        
+        return discovered_count
+
+    def _write_scan_batch(
+        self,
+        task_id: int,
+        batch: List[Tuple[str, Dict[str, Any]]],
+        completed_ips: int,
+        total_ips: int
+    ) -> bool:
+        """Insert a batch of scan rows with a progress update; return True if the task was cancelled."""
+        # One timestamp for the whole batch rather than a clock read per row
+        timestamp = datetime.utcnow()
+        self.db.execute(Scan.__table__.insert(), [dict(scan_row, timestamp=timestamp) for _, scan_row in batch])
+        # Ensure progress never exceeds 100%
+        progress = int((completed_ips / total_ips) * 100) if total_ips > 0 else 0
+        self.db.execute(
+            update(ScanTask).where(ScanTask.id == task_id).values(
+                current_ip=batch[-1][0],
+                completed_ips=completed_ips,
+                progress=min(progress, 100)
+            )
+        )
+        self.db.commit()
+        
+        status = self.db.query(ScanTask.status).filter(ScanTask.id == task_id).scalar()
+        return status == "cancelled"
+
+    async def _scan_ip(
+        self,
+        session: aiohttp.ClientSession,
+        task_id: int,
+        task_name: str,
+        ip: str,
+        scan_config: Dict[str, Any],
+        scanner: Dict[str, Any]
+    ) -> Tuple[str, Dict[str, Any]]:
+        """Scan a single IP and build its scan row for insertion."""
+        try:
+            scan_result = await self._perform_scan(session, ip, scan_config, scanner)
+        except Exception as e:
+            logger.error(f"Failed to scan {ip}: {e}")
+            return ip, self._failed_scan_row(task_id, ip, e, scan_config)
+        
+        return ip, self._build_scan_row(task_id, task_name, ip, scan_result, scan_config)
+
+    def _build_scan_row(
+        self,
+        task_id: int,
+        task_name: str,
+        ip: str,
+        scan_result: Dict[str, Any],
+        scan_config: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """Categorize a scan result and wrap it in a scan row for insertion."""
+        try:
+            # Categorize the scan result
+            categorization = self._categorize_scan_result(scan_result)
+            scan_result["categorization"] = categorization
+            
+            # Add task metadata, reusing the scanner's timestamp when it already set one
+            scan_result["task_metadata"] = {
+                "task_id": task_id,
+                "task_name": task_name,
+                "scan_timestamp": scan_result.get("timestamp") or datetime.utcnow().isoformat()
+            }
+            
+            logger.debug(f"Scanned {ip}: {categorization['result_type']}")
+            
+            return {
+                "asset_id": None,  # No asset created automatically
+                "scan_task_id": task_id,
+                "scan_data": scan_result,
+                "scan_type": scan_config["scan_type"],
+                "status": "completed" if categorization["is_device"] else "no_device"
+            }
+            
+        except Exception as e:
+            logger.error(f"Failed to scan {ip}: {e}")
+            return self._failed_scan_row(task_id, ip, e, scan_config)
+
+    def _failed_scan_row(self, task_id: int, ip: str, error: Exception, scan_config: Dict[str, Any]) -> Dict[str, Any]:
+        """Build the scan row recorded when scanning an IP raised."""
+        return {
+            "asset_id": None,
+            "scan_task_id": task_id,
+            "scan_data": {
+                "ip": ip,
+                "status": "failed",
+                "error": str(error),
+                "timestamp": datetime.utcnow().isoformat()
+            },
+            "scan_type": scan_config["scan_type"],
+            "status": "failed"
+        }
 
     def can_retry_scan_task(self, task_id: int) -> Dict[str, Any]:
         """Check if a failed scan task can be retried based on time limits."""
@@ -301,14 +521,12 @@ class ScanServiceV2:
             return {"can_retry": False, "reason": "Only failed scans can be retried"}
         
         # Get retry time limit from settings
-        from .asset_service import AssetService
-        asset_service = AssetService(self.db)
-        settings = asset_service.get_settings()
-        retry_limit_minutes = getattr(settings, 'scan_retry_time_limit_minutes', 30)
+        app_settings = self.asset_service.get_settings()
+        retry_limit_minutes = getattr(app_settings, 'scan_retry_time_limit_minutes', 30)
         
-        # Check if scan is within retry time limit
+        # Check if scan is within retry time limit (end_time is stored as naive UTC)
         if task.end_time:
-            time_since_failure = datetime.now(timezone.utc) - task.end_time
+            time_since_failure = datetime.utcnow() - task.end_time
             if time_since_failure.total_seconds() > (retry_limit_minutes * 60):
                 return {
                     "can_retry": False, 
@@ -345,7 +563,6 @@ class ScanServiceV2:
         self.db.commit()
         
         # Start the scan task
-        import threading
         scan_thread = threading.Thread(target=self.run_scan_task, args=(task_id,))
         scan_thread.daemon = True
         scan_thread.start()
@@ -362,7 +579,6 @@ class ScanServiceV2:
             raise ValueError("Scan template is required for all scan tasks")
         
         # Get template from database
-        from .template_service import TemplateService
         template_service = TemplateService(self.db)
         template = template_service.get_scan_template(task.scan_template_id)
         
@@ -373,53 +589,119 @@ class ScanServiceV2:
         config = template.scan_config.copy()
         return config
 
-    def _perform_scan(self, ip: str, scan_config: Dict[str, Any]) -> Dict[str, Any]:
-        """Perform a comprehensive scan using the optimal scanner service."""
+    def _group_ips_by_scanner(
+        self,
+        target: str,
+        total_ips: int,
+        ips_to_scan: Iterator[str]
+    ) -> List[Tuple[Optional[Dict[str, Any]], int, Iterator[str]]]:
+        """Split a task's IPs into (scanner, IP count, IPs) groups, matching each IP as a per-IP lookup would."""
+        target_network = ipaddress.ip_network(target, strict=False)
+        
+        # Scanner subnets overlapping the target, in the order get_best_scanner_for_target tries them
+        routes = []
+        for config in self.scanner_service.get_scanner_configs(is_active=True):
+            for subnet in config.subnets or ():
+                try:
+                    network = ipaddress.ip_network(subnet, strict=False)
+                except ValueError:
+                    continue
+                if network.version == target_network.version and network.overlaps(target_network):
+                    routes.append((network, config))
+        
+        # A target inside the first matching subnet, or outside all of them, needs a single scanner
+        if not routes or target_network.subnet_of(routes[0][0]):
+            config = routes[0][1] if routes else self.scanner_service.get_default_scanner()
+            return [(self._scanner_info(config), total_ips, ips_to_scan)]
+        
+        # The target spans scanner subnets: route each IP to the first subnet containing it
+        default_scanner = self.scanner_service.get_default_scanner()
+        groups: Dict[Optional[int], Tuple[Any, List[str]]] = {}
+        for ip in ips_to_scan:
+            address = ipaddress.ip_address(ip)
+            config = next((config for network, config in routes if address in network), default_scanner)
+            groups.setdefault(config.id if config else None, (config, []))[1].append(ip)
+        
+        return [(self._scanner_info(config), len(ips), iter(ips)) for config, ips in groups.values()]
+
+    def _scanner_info(self, config: Optional[ScannerConfig]) -> Optional[Dict[str, Any]]:
+        """Copy a scanner configuration into a plain dict usable off the session."""
+        if not config:
+            return None
+        
+        return {
+            "id": config.id,
+            "name": config.name,
+            "url": config.url,
+            "timeout": config.timeout_seconds or 30,
+            "is_default": config.is_default,
+            "max_concurrent_scans": config.max_concurrent_scans
+        }
+
+    async def _perform_scan(
+        self,
+        session: aiohttp.ClientSession,
+        ip: str,
+        scan_config: Dict[str, Any],
+        scanner: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """Perform a comprehensive scan using the task's scanner service."""
         try:
-            # Get the best scanner for this target IP
-            optimal_scanner = self.scanner_service.get_best_scanner_for_target(ip)
-            
-            if not optimal_scanner:
-                logger.warning(f"No scanner available for {ip}, using local nmap")
-                return self._perform_local_scan(ip, scan_config)
-            
-            # Use the optimal scanner URL
-            scanner_url = optimal_scanner.url
-            logger.info(f"Using scanner '{optimal_scanner.name}' ({scanner_url}) for target {ip}")
+            scanner_url = scanner["url"]
             
             # Prepare scan request
             scan_request = {
                 "target": ip,
                 "scan_type": scan_config.get("scan_type", "standard"),
-                "timeout": optimal_scanner.timeout_seconds or 30,
+                "timeout": scanner["timeout"],
                 "arguments": scan_config.get("arguments", "-sS -O -sV -A")
             }
             
-            # Call scanner service
-            response = requests.post(
-                f"{scanner_url}/scan",
-                json=scan_request,
-                timeout=(optimal_scanner.timeout_seconds or 30) + 5  # Slightly longer than scanner timeout
-            )
+            # Call scanner service, retrying transient gateway errors and dropped connections
+            for attempt in range(SCANNER_MAX_RETRIES + 1):
+                if attempt:
+                    delay = SCANNER_RETRY_BACKOFF * (2 ** (attempt - 1))
+                    await asyncio.sleep(delay * (0.5 + random.random()))
+                
+                try:
+                    async with session.post(
+                        f"{scanner_url}/scan",
+                        json=scan_request,
+                        timeout=aiohttp.ClientTimeout(total=scanner["timeout"] + 5)  # Slightly longer than scanner timeout
+                    ) as response:
+                        if response.status == 200:
+                            scan_result = await response.json()
+                            # The scanner reports down hosts as failed, so a completed scan means the host is up
+                            if scan_result.get("status") == "completed":
+                                scan_result.setdefault("host_state", "up")
+                            if not scan_config.get("include_raw_output", False):
+                                scan_result.pop("raw_output", None)
+                            scan_result["scanner_info"] = {
+                                "scanner_id": scanner["id"],
+                                "scanner_name": scanner["name"],
+                                "scanner_url": scanner_url,
+                                "scan_method": "remote_scanner",
+                                "is_satellite": not scanner["is_default"]
+                            }
+                            return scan_result
+                        if response.status not in _RETRY_STATUSES:
+                            break
+                        logger.debug(f"Scanner '{scanner['name']}' returned {response.status} for {ip} (attempt {attempt + 1})")
+                except asyncio.TimeoutError:
+                    # A timed out scan is not worth repeating at full timeout
+                    raise
+                except aiohttp.ClientConnectionError as e:
+                    if attempt == SCANNER_MAX_RETRIES:
+                        raise
+                    logger.debug(f"Scanner '{scanner['name']}' connection error for {ip} (attempt {attempt + 1}): {e}")
             
-            if response.status_code == 200:
-                scan_result = response.json()
-                scan_result["scanner_info"] = {
-                    "scanner_id": optimal_scanner.id,
-                    "scanner_name": optimal_scanner.name,
-                    "scanner_url": scanner_url,
-                    "scan_method": "remote_scanner",
-                    "is_satellite": not optimal_scanner.is_default
-                }
-                return scan_result
-            else:
-                # Fallback to local nmap if scanner service fails
-                logger.warning(f"Scanner '{optimal_scanner.name}' failed for {ip}, using local nmap")
-                return self._perform_local_scan(ip, scan_config)
+            # Fallback to local nmap if scanner service fails
+            logger.warning(f"Scanner '{scanner['name']}' failed for {ip}, using local nmap")
+            return await self._run_local_scan(ip, scan_config)
                 
-        except requests.exceptions.RequestException as e:
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
             logger.warning(f"Scanner service unavailable for {ip}: {e}, using local nmap")
-            return self._perform_local_scan(ip, scan_config)
+            return await self._run_local_scan(ip, scan_config)
         except Exception as e:
             logger.error(f"Scan failed for {ip}: {e}")
             return {
@@ -430,10 +712,24 @@ class ScanServiceV2:
                 "scan_type": scan_config.get("scan_type", "standard")
             }
 
-    def _perform_local_scan(self, ip: str, scan_config: Dict[str, Any]) -> Dict[str, Any]:
-        """Fallback local scan using nmap directly."""
-        import re
-        
+    async def _run_local_scan(self, ip: str, scan_config: Dict[str, Any]) -> Dict[str, Any]:
+        """Fallback local scan of a single IP using nmap directly."""
+        scan_results = {host_ip: result async for host_ip, result in self._iter_local_scan([ip], scan_config)}
+        return scan_results[ip]
+
+    async def _iter_local_scan(
+        self,
+        ips: List[str],
+        scan_config: Dict[str, Any]
+    ) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+        """Scan several IPs with one nmap subprocess, yielding each host's result as nmap reports it."""
+        scan_type = scan_config.get("scan_type", "standard")
+        include_raw_output = scan_config.get("include_raw_output", False)
+        remaining = dict.fromkeys(ips)
+        proc = None
+        stderr_reader = None
+        stderr = ""
+        error = None
         try:
             # Add network interface options for better host network access
             base_opts = ["--privileged", "--send-ip"]  # Use privileged mode and send IP packets
@@ -442,50 +738,100 @@ class ScanServiceV2:
             arguments = scan_config.get("arguments", "-sS -O -sV -A")
             timeout = scan_config.get("timeout", 300)
             
-            # Parse arguments and build command
+            # Parse arguments and build command; the template timeout applies per host
             args_list = arguments.split()
-            cmd = ["nmap"] + base_opts + args_list + [ip]
+            cmd = ["nmap"] + base_opts + ["--host-timeout", f"{timeout}s"] + args_list + ["-oX", "-"] + ips
             
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=timeout)
+            proc = await asyncio.create_subprocess_exec(
+                *cmd, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
+            )
+            stderr_reader = asyncio.ensure_future(proc.stderr.read())
             
-            # Parse results
-            scan_type = scan_config.get("scan_type", "standard")
-            scan_result = self._parse_nmap_output(result, ip, scan_type)
-            scan_result["scanner_info"] = {
-                "scanner_url": "local_nmap",
-                "scan_method": "local_nmap"
-            }
+            # Overall guard only; nmap enforces the per-host timeout itself
+            loop = asyncio.get_running_loop()
+            deadline = loop.time() + timeout * len(ips)
             
-            return scan_result
+            # Parse the XML as nmap writes it and hand off each <host> once it is complete
+            parser = ET.XMLPullParser(events=("end",))
+            try:
+                while chunk := await asyncio.wait_for(proc.stdout.read(NMAP_READ_SIZE), timeout=deadline - loop.time()):
+                    parser.feed(chunk)
+                    for _, elem in parser.read_events():
+                        if elem.tag != "host":
+                            continue
+                        ip = self._nmap_host_ip(elem)
+                        if ip not in remaining and len(ips) == 1:
+                            ip = ips[0]
+                        if ip in remaining:
+                            del remaining[ip]
+                            yield ip, self._build_nmap_host_result(elem, ip, scan_type, include_raw_output)
+                        elem.clear()
+                parser.close()
+                await asyncio.wait_for(proc.wait(), timeout=max(0, deadline - loop.time()))
+            except asyncio.TimeoutError:
+                error = "Scan timeout"
+            except ET.ParseError as e:
+                error = f"Unable to parse nmap output: {e}"
             
-        except subprocess.TimeoutExpired:
-            return {
-                "ip": ip,
-                "status": "failed",
-                "error": "Scan timeout",
-                "timestamp": datetime.utcnow().isoformat(),
-                "scan_type": scan_config.get("scan_type", "standard")
-            }
+            # An nmap that gave up on its own explains why on stderr (bad arguments, no privileges, ...)
+            returncode, stderr = await self._finish_nmap(proc, stderr_reader)
+            if returncode:
+                error = stderr.strip() or f"nmap exited with code {returncode}"
         except Exception as e:
-            return {
-                "ip": ip,
-                "status": "failed",
-                "error": str(e),
-                "timestamp": datetime.utcnow().isoformat(),
-                "scan_type": scan_type
-            }
+            error = str(e)
+        finally:
+            # Do not leave nmap running on timeout or when the scan task is cancelled
+            if proc is not None and proc.returncode is None:
+                proc.kill()
+            if stderr_reader is not None:
+                stderr_reader.cancel()
+        
+        # Targets nmap never reported on
+        timestamp = datetime.utcnow().isoformat()
+        for ip in remaining:
+            if error:
+                yield ip, {
+                    "ip": ip,
+                    "status": "failed",
+                    "error": error,
+                    "stderr": stderr,
+                    "timestamp": timestamp,
+                    "scan_type": scan_type
+                }
+            else:
+                scan_result = self._new_nmap_scan_result(ip, scan_type, timestamp)
+                scan_result["status"] = "failed"
+                scan_result["error"] = "Host is down or unreachable"
+                scan_result["stderr"] = stderr
+                yield ip, scan_result
 
-    def _parse_nmap_output(self, result: subprocess.CompletedProcess, ip: str, scan_type: str) -> Dict[str, Any]:
-        """Parse nmap output into structured data."""
-        import re
+    async def _finish_nmap(
+        self,
+        proc: asyncio.subprocess.Process,
+        stderr_reader: asyncio.Future
+    ) -> Tuple[Optional[int], str]:
+        """Wait briefly for nmap to exit, killing it otherwise; return its own exit code (None if killed) and stderr."""
+        try:
+            returncode = await asyncio.wait_for(proc.wait(), timeout=NMAP_EXIT_GRACE_SECONDS)
+        except asyncio.TimeoutError:
+            returncode = None
+            proc.kill()
+            await proc.wait()
         
-        scan_result = {
+        try:
+            stderr = await asyncio.wait_for(stderr_reader, timeout=NMAP_EXIT_GRACE_SECONDS)
+        except asyncio.TimeoutError:
+            stderr = b""
+        return returncode, stderr.decode(errors="replace")
+
+    def _new_nmap_scan_result(self, ip: str, scan_type: str, timestamp: str) -> Dict[str, Any]:
+        """Build an empty local scan result for an IP."""
+        return {
             "ip": ip,
             "scan_type": scan_type,
-            "timestamp": datetime.utcnow().isoformat(),
-            "status": "completed" if result.returncode == 0 else "failed",
-            "raw_output": result.stdout,
-            "stderr": result.stderr,
+            "timestamp": timestamp,
+            "status": "completed",
+            "host_state": None,
             "ports": [],
             "os_info": {},
             "device_info": {},
@@ -496,94 +842,134 @@ class ScanServiceV2:
             "response_time": None,
             "ttl": None,
             "services": [],
-            "network_info": {}
+            "network_info": {},
+            "scanner_info": {
+                "scanner_url": "local_nmap",
+                "scan_method": "local_nmap"
+            }
         }
+
+    def _build_nmap_host_result(
+        self,
+        host: ET.Element,
+        ip: str,
+        scan_type: str,
+        include_raw_output: bool = False
+    ) -> Dict[str, Any]:
+        """Turn a completed nmap <host> element into a structured scan result."""
+        scan_result = self._new_nmap_scan_result(ip, scan_type, datetime.utcnow().isoformat())
+        self._parse_nmap_host(host, scan_result)
+        if include_raw_output:
+            scan_result["raw_output"] = ET.tostring(host, encoding="unicode")
         
         # Check if host is up
-        if "Host is up" not in result.stdout and "0 hosts up" in result.stdout:
+        if scan_result["host_state"] != "up":
             scan_result["status"] = "failed"
             scan_result["error"] = "Host is down or unreachable"
             return scan_result
         
-        # Extract hostname
-        hostname_match = re.search(r'for (\S+)', result.stdout)
-        if hostname_match:
-            scan_result["hostname"] = hostname_match.group(1)
+        # Determine device type
+        scan_result["device_type"] = self._determine_device_type(scan_result)
+        
+        return scan_result
+
+    def _nmap_host_ip(self, host: ET.Element) -> Optional[str]:
+        """Return the IP address nmap reported for a <host> element."""
+        for address in host.iterfind("address"):
+            if address.get("addrtype") in ("ipv4", "ipv6"):
+                return address.get("addr")
+        return None
+
+    def _parse_nmap_host(self, host: ET.Element, scan_result: Dict[str, Any]) -> None:
+        """Populate scan_result from a single nmap <host> element."""
+        status = host.find("status")
+        if status is not None:
+            scan_result["host_state"] = status.get("state")
+            reason_ttl = status.get("reason_ttl")
+            if reason_ttl and reason_ttl != "0":
+                scan_result["ttl"] = int(reason_ttl)
         
         # Extract MAC address and vendor
-        mac_match = re.search(r'MAC Address: ([0-9A-Fa-f:]{17}) \(([^)]+)\)', result.stdout)
-        if mac_match:
-            scan_result["addresses"]["mac"] = mac_match.group(1)
-            scan_result["vendor"] = mac_match.group(2)
-        
-        # Extract response time
-        response_time_match = re.search(r'(\d+\.\d+)s latency', result.stdout)
-        if response_time_match:
-            scan_result["response_time"] = float(response_time_match.group(1))
-        
-        # Extract TTL
-        ttl_match = re.search(r'TTL=(\d+)', result.stdout)
-        if ttl_match:
-            scan_result["ttl"] = int(ttl_match.group(1))
-        
-        # Extract OS information
-        os_match = re.search(r'Running: ([^,]+)', result.stdout)
-        if os_match:
-            scan_result["os_info"]["os_name"] = os_match.group(1).strip()
-        
-        # Extract OS details
-        os_details_match = re.search(r'OS details: ([^,]+)', result.stdout)
-        if os_details_match:
-            scan_result["os_info"]["os_details"] = os_details_match.group(1).strip()
+        for address in host.iterfind("address"):
+            if address.get("addrtype") == "mac":
+                scan_result["addresses"]["mac"] = address.get("addr")
+                scan_result["vendor"] = address.get("vendor")
+        
+        # Extract hostname
+        hostname = host.find("hostnames/hostname")
+        if hostname is not None:
+            scan_result["hostname"] = hostname.get("name")
+        
+        # Extract response time (nmap reports srtt in microseconds)
+        times = host.find("times")
+        if times is not None and times.get("srtt"):
+            scan_result["response_time"] = int(times.get("srtt")) / 1_000_000
+        
+        # Extract OS information from the best match
+        osmatch = host.find("os/osmatch")
+        if osmatch is not None:
+            scan_result["os_info"]["os_name"] = osmatch.get("name")
+            scan_result["os_info"]["os_details"] = osmatch.get("name")
+            scan_result["os_info"]["os_accuracy"] = int(osmatch.get("accuracy", 0))
+            osclass = osmatch.find("osclass")
+            if osclass is not None:
+                scan_result["os_info"]["os_family"] = osclass.get("osfamily")
         
         # Extract open ports
-        port_matches = re.findall(r'(\d+)/(\w+)\s+open\s+(\w+)(?:\s+([^,]+))?', result.stdout)
-        for port, protocol, service, version in port_matches:
+        for port in host.iterfind("ports/port"):
+            state = port.find("state")
+            if state is None or state.get("state") != "open":
+                continue
+            service = port.find("service")
+            service_name = service.get("name") if service is not None else None
+            version = None
+            if service is not None:
+                version = " ".join(
+                    filter(None, (service.get("product"), service.get("version"), service.get("extrainfo")))
+                ) or None
             port_info = {
-                "port": int(port),
-                "protocol": protocol,
-                "service": service,
+                "port": int(port.get("portid")),
+                "protocol": port.get("protocol"),
+                "service": service_name,
                 "state": "open",
-                "version": version.strip() if version else None
+                "version": version
             }
             scan_result["ports"].append(port_info)
-            scan_result["services"].append(service)
-        
-        # Determine device type
-        scan_result["device_type"] = self._determine_device_type(scan_result)
-        
-        return scan_result
+            if service_name:
+                scan_result["services"].append(service_name)
 
     def _determine_device_type(self, scan_result: Dict[str, Any]) -> str:
         """Determine device type based on scan results."""
-        services = scan_result.get("services", [])
+        services = set(scan_result.get("services") or ())
         ports = scan_result.get("ports", [])
-        vendor = scan_result.get("vendor", "")
+        vendor = scan_result.get("vendor") or ""
         
         # Network infrastructure
-        if any(service in services for service in ["ssh", "telnet", "snmp"]):
-            if any(port["port"] in [161, 162] for port in ports):  # SNMP
+        if services & _NETWORK_SERVICES:
+            if not _SNMP_PORTS.isdisjoint(port["port"] for port in ports):  # SNMP
                 return "network_device"
             return "server"
         
         # Web servers
-        if any(service in services for service in ["http", "https", "apache", "nginx"]):
+        if services & _WEB_SERVICES:
             return "web_server"
         
         # Database servers
-        if any(service in services for service in ["mysql", "postgresql", "mssql", "oracle"]):
+        if services & _DATABASE_SERVICES:
             return "database_server"
         
         # Printers
-        if any(service in services for service in ["ipp", "lpd", "printer"]):
+        if services & _PRINTER_SERVICES:
             return "printer"
         
         # IoT devices
-        if vendor and any(brand in vendor.lower() for brand in ["cisco", "netgear", "linksys", "tp-link"]):
-            return "network_device"
+        if vendor:
+            vendor_lower = vendor.lower()
+            if any(brand in vendor_lower for brand in _NETWORK_VENDORS):
+                return "network_device"
         
         # Default
-        if scan_result.get("ports"):
+        if ports:
             return "unknown_device"
         else:
             return "host"
@@ -607,7 +993,7 @@ class ScanServiceV2:
             }
 
         # Check if host is up
-        if "Host is up" not in scan_result.get("raw_output", ""):
+        if scan_result.get("host_state") != "up":
             result_type = "no_response"
             confidence = "none"
             indicators.append("No response")
@@ -618,48 +1004,50 @@ class ScanServiceV2:
                 "is_device": False
             }
 
+        flags = self._extract_flags(scan_result)
+        
         # Analyze indicators to determine device type and confidence
-        if scan_result.get("ports") and len(scan_result["ports"]) > 0:
-            indicators.append(f"{len(scan_result['ports'])} open ports")
+        if flags.port_count:
+            indicators.append(f"{flags.port_count} open ports")
             confidence = "high"
             result_type = "active_device"
 
-        if scan_result.get("hostname") and scan_result["hostname"] != scan_result.get("ip"):
+        if flags.has_hostname:
             indicators.append("DNS hostname")
             if confidence == "low":
                 confidence = "medium"
             if result_type == "unknown":
                 result_type = "named_device"
 
-        if scan_result.get("addresses", {}).get("mac"):
+        if flags.has_mac:
             indicators.append("MAC address")
             confidence = "high"
             result_type = "physical_device"
 
-        if scan_result.get("os_info", {}).get("os_name"):
+        if flags.has_os:
             indicators.append("OS detected")
             confidence = "high"
             result_type = "active_device"
 
-        if scan_result.get("vendor"):
+        if flags.has_vendor:
             indicators.append("Vendor info")
             if confidence == "low":
                 confidence = "medium"
             if result_type == "unknown":
                 result_type = "identified_device"
 
-        if scan_result.get("response_time") is not None:
+        if flags.has_response_time:
             indicators.append("Response time")
             if result_type == "unknown":
                 result_type = "responding_host"
 
-        if scan_result.get("ttl") is not None:
+        if flags.has_ttl:
             indicators.append("TTL info")
             if result_type == "unknown":
                 result_type = "network_device"
 
-        if scan_result.get("services") and len(scan_result["services"]) > 0:
-            indicators.append(f"{len(scan_result['services'])} services")
+        if flags.service_count:
+            indicators.append(f"{flags.service_count} services")
             if confidence == "low":
                 confidence = "medium"
             if result_type == "unknown":
@@ -675,23 +1063,34 @@ class ScanServiceV2:
             "result_type": result_type,
             "confidence": confidence,
             "indicators": indicators,
-            "is_device": self._is_device_discovered(scan_result)
+            "is_device": self._is_device_discovered(scan_result, flags)
         }
 
-    def _is_device_discovered(self, scan_result: Dict[str, Any]) -> bool:
+    def _extract_flags(self, scan_result: Dict[str, Any]) -> _ScanFlags:
+        """Read the discovery indicators from a scan result in one pass."""
+        hostname = scan_result.get("hostname")
+        return _ScanFlags(
+            port_count=len(scan_result.get("ports") or ()),
+            has_mac=bool((scan_result.get("addresses") or {}).get("mac")),
+            has_hostname=bool(hostname) and hostname != scan_result.get("ip"),
+            has_os=bool((scan_result.get("os_info") or {}).get("os_name")),
+            has_vendor=bool(scan_result.get("vendor")),
+            has_response_time=scan_result.get("response_time") is not None,
+            has_ttl=scan_result.get("ttl") is not None,
+            service_count=len(scan_result.get("services") or ())
+        )
+
+    def _is_device_discovered(self, scan_result: Dict[str, Any], flags: Optional[_ScanFlags] = None) -> bool:
         """Determine if a device was actually discovered."""
         # Device is considered discovered if:
         # 1. Has open ports
         # 2. Has MAC address
         # 3. Has hostname (different from IP)
         # 4. Has OS information
+        if flags is None:
+            flags = self._extract_flags(scan_result)
         
-        has_ports = scan_result.get("ports") and len(scan_result["ports"]) > 0
-        has_mac = scan_result.get("addresses", {}).get("mac")
-        has_hostname = scan_result.get("hostname") and scan_result["hostname"] != scan_result.get("ip")
-        has_os = scan_result.get("os_info", {}).get("os_name")
-        
-        return has_ports or has_mac or has_hostname or has_os
+        return bool(flags.port_count) or flags.has_mac or flags.has_hostname or flags.has_os
 
     def delete_scan(self, scan_id: int) -> bool:
         """Delete a scan record."""
@@ -710,18 +1109,18 @@ class ScanServiceV2:
     
     def get_scan_statistics(self) -> Dict[str, Any]:
         """Get scan task statistics."""
-        total_tasks = self.db.query(ScanTask).count()
-        running_tasks = self.db.query(ScanTask).filter(ScanTask.status == "running").count()
-        completed_tasks = self.db.query(ScanTask).filter(ScanTask.status == "completed").count()
-        failed_tasks = self.db.query(ScanTask).filter(ScanTask.status == "failed").count()
-        cancelled_tasks = self.db.query(ScanTask).filter(ScanTask.status == "cancelled").count()
+        status_counts = dict(
+            self.db.query(ScanTask.status, func.count(ScanTask.id))
+            .group_by(ScanTask.status)
+            .all()
+        )
         
         return {
-            "total_tasks": total_tasks,
-            "running_tasks": running_tasks,
-            "completed_tasks": completed_tasks,
-            "failed_tasks": failed_tasks,
-            "cancelled_tasks": cancelled_tasks
+            "total_tasks": sum(status_counts.values()),
+            "running_tasks": status_counts.get("running", 0),
+            "completed_tasks": status_counts.get("completed", 0),
+            "failed_tasks": status_counts.get("failed", 0),
+            "cancelled_tasks": status_counts.get("cancelled", 0)
         }
     
     def update_scan_task(self, task_id: int, task_data: ScanTaskUpdate) -> Optional[ScanTask]:
@@ -750,43 +1149,54 @@ class ScanServiceV2:
             raise ValueError(f"Scan task {task_id} not found")
         
         scans = self.db.query(Scan).filter(Scan.scan_task_id == task_id).all()
+        # The rows are returned anyway, so count them in one pass rather than querying again
+        status_counts = Counter(scan.status for scan in scans)
         
         return {
             "task": task,
             "scans": scans,
             "total_scans": len(scans),
-            "completed_scans": len([s for s in scans if s.status == "completed"]),
-            "failed_scans": len([s for s in scans if s.status == "failed"])
+            "completed_scans": status_counts.get("completed", 0),
+            "failed_scans": status_counts.get("failed", 0)
         }
     
-    def download_scan_results(self, task_id: int) -> Dict[str, Any]:
-        """Download scan results for a specific task."""
+    def download_scan_results(self, task_id: int) -> Iterator[str]:
+        """Download scan results for a specific task as a stream of JSON chunks."""
         task = self.get_scan_task(task_id)
         if not task:
             raise ValueError(f"Scan task {task_id} not found")
         
-        scans = self.db.query(Scan).filter(Scan.scan_task_id == task_id).all()
-        
-        # Format results for download
-        results = {
+        # Build the header eagerly so a missing task fails before streaming starts
+        header = {
             "task_id": task_id,
             "task_name": task.name,
             "target": task.target,
             "status": task.status,
             "start_time": task.start_time.isoformat() if task.start_time else None,
-            "end_time": task.end_time.isoformat() if task.end_time else None,
-            "scans": []
+            "end_time": task.end_time.isoformat() if task.end_time else None
         }
+        return self._stream_scan_results(task_id, header)
+    
+    def _stream_scan_results(self, task_id: int, header: Dict[str, Any]) -> Iterator[str]:
+        """Yield the download document, fetching scan rows in chunks."""
+        yield json.dumps(header)[:-1] + ', "scans": ['
         
-        for scan in scans:
-            scan_data = {
-                "scan_id": scan.id,
-                "asset_id": scan.asset_id,
-                "ip_address": scan.ip_address,
-                "status": scan.status,
-                "timestamp": scan.timestamp.isoformat() if scan.timestamp else None,
-                "results": scan.results
-            }
-            results["scans"].append(scan_data)
+        rows = self.db.query(
+            Scan.id, Scan.asset_id, Scan.status, Scan.timestamp, Scan.scan_data
+        ).filter(
+            Scan.scan_task_id == task_id
+        ).execution_options(stream_results=True).yield_per(500)
+        
+        separator = ""
+        for scan_id, asset_id, status, timestamp, scan_data in rows:
+            yield separator + json.dumps({
+                "scan_id": scan_id,
+                "asset_id": asset_id,
+                "ip_address": (scan_data or {}).get("ip"),
+                "status": status,
+                "timestamp": timestamp.isoformat() if timestamp else None,
+                "results": scan_data
+            })
+            separator = ", "
         
-        return results
\ No newline at end of file
+        yield "]}"
\ No newline at end of file
@@ -6,6 +6,7 @@ from sqlalchemy.orm import Session
 from sqlalchemy import and_, desc
 from datetime import datetime
 import requests
+from requests.adapters import HTTPAdapter
 import ipaddress
 import json
 import logging
@@ -19,6 +20,19 @@ from .cache_service import CacheableService, cached
 logger = logging.getLogger(__name__)
 
 
+def _build_http_session() -> requests.Session:
+    """Create a pooled HTTP session for calls to scanner services."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=10, pool_maxsize=32)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+# Shared across service instances so keep-alive connections to scanners are reused
+_http = _build_http_session()
+
+
 class ScannerServiceV2(BaseService[ScannerConfig], CommonValidationMixin, CacheableService):
     """Enhanced scanner service with improved error handling and caching."""
     
@@ -214,7 +228,7 @@ class ScannerServiceV2(BaseService[ScannerConfig], CommonValidationMixin, Cachea
         
         try:
             # Test connection to scanner
-            response = requests.get(
+            response = _http.get(
                 f"{config.url}/health",
                 timeout=config.timeout_seconds or 30
             )
@@ -256,7 +270,7 @@ class ScannerServiceV2(BaseService[ScannerConfig], CommonValidationMixin, Cachea
         
         try:
             # Test connection to scanner
-            response = requests.post(
+            response = _http.post(
                 f"{config.url}/test",
                 json={'target_ip': test_ip},
                 timeout=config.timeout_seconds or 30
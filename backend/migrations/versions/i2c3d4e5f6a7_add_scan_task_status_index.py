@@ -0,0 +1,25 @@
+"""add composite index on scans task and status
+
+Revision ID: i2c3d4e5f6a7
+Revises: 3cf60a52d1a0
+Create Date: 2026-10-17 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'i2c3d4e5f6a7'
+down_revision = '3cf60a52d1a0'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Per-task status lookups (discovered device counts, result summaries)
+    op.create_index('ix_scans_task_status', 'scans', ['scan_task_id', 'status'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_scans_task_status', table_name='scans')
@@ -0,0 +1,30 @@
+"""add partial index on running scan tasks
+
+Revision ID: j3d4e5f6a7b8
+Revises: i2c3d4e5f6a7
+Create Date: 2026-10-17 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'j3d4e5f6a7b8'
+down_revision = 'i2c3d4e5f6a7'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Active scan lookups only ever touch running tasks; ix_scan_tasks_status
+    # already covers the status counts
+    op.create_index(
+        'ix_scan_tasks_running_start_time', 'scan_tasks', ['start_time'], unique=False,
+        postgresql_where=sa.text("status = 'running'"),
+        sqlite_where=sa.text("status = 'running'")
+    )
+
+
+def downgrade():
+    op.drop_index('ix_scan_tasks_running_start_time', table_name='scan_tasks')
@@ -0,0 +1,28 @@
+"""add scan task start time and scan asset indexes
+
+Revision ID: k4e5f6a7b8c9
+Revises: j3d4e5f6a7b8
+Create Date: 2026-10-17 11:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'k4e5f6a7b8c9'
+down_revision = 'j3d4e5f6a7b8'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # scan_tasks.status and scans.scan_task_id are already covered by
+    # ix_scan_tasks_status and ix_scans_task_status
+    op.create_index('ix_scan_tasks_start_time', 'scan_tasks', ['start_time'], unique=False)
+    op.create_index('ix_scans_asset_timestamp', 'scans', ['asset_id', 'timestamp'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_scans_asset_timestamp', table_name='scans')
+    op.drop_index('ix_scan_tasks_start_time', table_name='scan_tasks')